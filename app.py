@@ -1,9 +1,10 @@
 import streamlit as st
 import pandas as pd
 import os
-import time
 from streamlit_folium import st_folium, folium_static
 import json
+from shapely.geometry import shape, Point
+from shapely.strtree import STRtree
 
 # Import custom modules
 import data_processor as dp
@@ -17,103 +18,233 @@ st.set_page_config(
     layout="wide"
 )
 
-# Add custom CSS to make the map container larger and improve the UI
-st.markdown("""
-<style>
-    /* Hide developer console overlay */
-    .stDeployButton, .viewerBadge_container__1QSob, header {
-        display: none !important;
-    }
-    div[data-testid="stToolbar"] {
-        display: none !important;
-    }
-    .stStatusWidget, .stDecoration {
-        display: none !important;
-    }
-    .stWarning {
-        display: none !important;
-    }
-    
-    /* Improved styling */
-    .main .block-container {
-        padding-top: 1rem;
-        padding-bottom: 1rem;
-    }
-    
-    .stApp {
-        background-color: #f8f9fa;
-    }
-    
-    .stSidebar {
-        background-color: #ffffff;
-        border-left: 1px solid #e9ecef;
-    }
-    
-    /* Header styling */
-    h1, h2, h3 {
-        color: #8b4513;
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    }
-    
-    /* Metrics styling */
-    div[data-testid="metric-container"] {
-        background-color: #fff;
-        border-radius: 8px;
-        padding: 10px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-    }
-    
-    div[data-testid="metric-container"] > div:first-child {
-        color: #8b4513;
-    }
-    
-    div[data-testid="stHorizontalBlock"] {
-        gap: 10px;
-    }
-    
-    /* Chart styling */
-    div[data-testid="stPlotlyChart"] {
-        background-color: white;
-        border-radius: 8px;
-        padding: 10px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-    }
-    
-    /* Divider styling */
-    hr {
-        border-color: #e9ecef;
-        margin: 1rem 0;
-    }
-    
-    /* Info box styling */
-    div[data-testid="stAlert"] {
-        background-color: #f1f8ff;
-        border-color: #bee3f8;
-        color: #2a4365;
-        border-radius: 8px;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Cache data loading to improve performance
+# Custom CSS lives in static/style.css (served via enableStaticServing and
+# cached by the browser); reruns re-send only this one-line link tag
+# instead of the full multi-KB style block
+st.markdown('<link rel="stylesheet" href="./app/static/style.css">',
+            unsafe_allow_html=True)
+
+# Cache the GeoJSON by reference: cache_resource skips the pickle
+# round-trip cache_data would do on the large nested dict
+@st.cache_resource
+def load_geo_data():
+    """
+    Load and cache the district GeoJSON data
+
+    Returns:
+        tuple: GeoJSON data, districts dictionary
+    """
+    # Prefer the pre-simplified boundaries (scripts/simplify_geojson.py)
+    # when present; otherwise the loader simplifies the full-resolution
+    # file itself, caching the result on disk
+    geojson_path = "attached_assets/punjab.min.geojson"
+    if os.path.exists(geojson_path):
+        return dp.load_geojson(geojson_path, tolerance=None)
+
+    return dp.load_geojson("attached_assets/punjab.geojson")
+
 @st.cache_data(ttl=3600)
-def load_data():
+def load_event_data():
     """
-    Load and cache the GeoJSON and CSV data
-    
+    Load and cache the fire events data and its aggregate cube
+
     Returns:
-        tuple: GeoJSON data, districts dictionary, fire events dataframe
+        tuple: Fire events dataframe, precomputed (year, district, month)
+        aggregate cube
     """
-    geojson_path = "attached_assets/punjab.geojson"
     csv_path = "attached_assets/stubble_with_district_full_final.csv"
-    
-    # Load GeoJSON data
-    geojson_data, districts_dict = dp.load_geojson(geojson_path)
-    
-    # Load fire events data
     fire_events_df = dp.load_fire_events(csv_path)
-    
-    return geojson_data, districts_dict, fire_events_df
+
+    # Precompute the aggregate cube all chart aggregations slice from
+    agg_cube = dp.build_agg_cube(fire_events_df) if not fire_events_df.empty else None
+
+    return fire_events_df, agg_cube
+
+def load_data():
+    """
+    Load the GeoJSON and CSV data via their cached loaders
+
+    Returns:
+        tuple: GeoJSON data, districts dictionary, fire events dataframe,
+        precomputed (year, district, month) aggregate cube
+    """
+    geojson_data, districts_dict = load_geo_data()
+    fire_events_df, agg_cube = load_event_data()
+    return geojson_data, districts_dict, fire_events_df, agg_cube
+
+# Cache the district/year lists so reruns skip the unique/sort passes
+@st.cache_data
+def load_metadata(_df):
+    """
+    Compute the district and year lists once for the cached dataframe
+
+    Args:
+        _df (pd.DataFrame): Fire events dataframe (not hashed)
+
+    Returns:
+        tuple: Sorted district list, sorted year list
+    """
+    return dp.get_district_list(_df), dp.get_year_list(_df)
+
+# Cache the spatial index separately so the tree is built once and shared by reference
+@st.cache_resource
+def load_spatial_index(_districts_dict):
+    """
+    Build an STRtree spatial index over the district polygons
+
+    Args:
+        _districts_dict (dict): Dictionary of district features
+        (underscore prefix skips Streamlit hashing)
+
+    Returns:
+        tuple: STRtree index, list of polygons, list of district names
+    """
+    names = []
+    polys = []
+    for district_name, feature in _districts_dict.items():
+        # Skip if not a valid district
+        if district_name == 'Unknown' or not district_name:
+            continue
+        names.append(district_name)
+        polys.append(shape(feature['geometry']))
+
+    return STRtree(polys), polys, names
+
+# Cache the rasterized lookup grid; clicks resolve with one array index
+@st.cache_resource
+def load_district_grid(_districts_dict):
+    """
+    Rasterize the district polygons into a coarse lookup grid
+
+    Args:
+        _districts_dict (dict): Dictionary of district features
+        (underscore prefix skips Streamlit hashing)
+
+    Returns:
+        tuple: uint8 grid, bounds, district names
+    """
+    return mh.build_district_grid(_districts_dict)
+
+# Cache filtering and aggregation on the selection keys so reruns that keep
+# the same selections skip the pandas work entirely
+@st.cache_data(ttl=3600)
+def filter_events(_df, districts_key, years_key):
+    """
+    Filter fire events for the given selections, memoized per selection
+
+    Args:
+        _df (pd.DataFrame): Full fire events dataframe (not hashed)
+        districts_key (tuple): Sorted tuple of selected district names
+        years_key (tuple): Sorted tuple of selected years
+
+    Returns:
+        pd.DataFrame: Filtered data
+    """
+    return dp.filter_data(_df, selected_districts=list(districts_key), selected_years=list(years_key))
+
+# The tiles+legend shell never changes; build it once and let render_map
+# deep-copy it instead of recreating the folium.Map per selection
+@st.cache_resource
+def load_base_map():
+    """
+    Build the invariant map shell (tiles, bounds, legend) once
+
+    Returns:
+        folium.Map: Base map with the legend baked in
+    """
+    base = mh.create_base_map()
+    return mh.add_legend(base)
+
+@st.cache_resource(max_entries=32)
+def build_map(_geojson_data, _districts_dict, _fire_events_df, districts_key, years_key):
+    """
+    Build the folium map for the given selections, cached per selection
+
+    Reruns triggered by anything other than a selection change (e.g. a
+    click outside any district) reuse the already-built map object.
+
+    Args:
+        _geojson_data (dict): GeoJSON data (not hashed)
+        _districts_dict (dict): Dictionary of district features (not hashed)
+        _fire_events_df (pd.DataFrame): Full fire events dataframe (not hashed)
+        districts_key (tuple): Sorted tuple of selected district names
+        years_key (tuple): Sorted tuple of selected years
+
+    Returns:
+        folium.Map: Complete map
+    """
+    # With every year deselected the map shows no markers (the original
+    # year-isin feed's behavior); filter_data would treat the empty
+    # tuple as "no filter" and serialize all ~46k events into the HTML
+    if years_key:
+        marker_feed = filter_events(_fire_events_df, (), years_key)
+    else:
+        marker_feed = _fire_events_df.iloc[0:0]
+
+    return mh.render_map(
+        _geojson_data,
+        _districts_dict,
+        marker_feed,
+        list(districts_key),
+        base_map=load_base_map()
+    )
+
+@st.cache_data(ttl=3600)
+def compute_stats(_agg_cube, districts_key, years_key):
+    """Compute summary statistics for the given selections, memoized per selection"""
+    return dp.get_stats_from_cube(_agg_cube, list(districts_key), list(years_key))
+
+@st.cache_data(ttl=3600)
+def compute_yearly_data(_agg_cube, districts_key, years_key):
+    """Aggregate fire events by year for the given selections, memoized per selection"""
+    return dp.get_yearly_data_from_cube(_agg_cube, list(districts_key), list(years_key))
+
+@st.cache_data(ttl=3600)
+def compute_monthly_data(_agg_cube, districts_key, years_key):
+    """Aggregate fire events by month for the given selections, memoized per selection"""
+    return dp.get_monthly_data_from_cube(_agg_cube, list(districts_key), list(years_key))
+
+# Cache chart construction so reruns that keep the same aggregation skip
+# rebuilding (and re-serializing) the Plotly figures
+@st.cache_data(show_spinner=False)
+def build_analytics_dashboard(_df, yearly_records, monthly_records, districts_key, years_key):
+    """
+    Build the combined yearly/monthly/seasonal figure, memoized
+
+    Keyed on the small aggregated record tuples plus the selection keys,
+    so the hash stays cheap regardless of raw event count.
+    """
+    yearly_data = pd.DataFrame(list(yearly_records), columns=['year', 'count'])
+    monthly_data = pd.DataFrame(list(monthly_records), columns=['month', 'month_name', 'count'])
+    seasonal_df = filter_events(_df, districts_key, years_key)
+    return vis.create_analytics_dashboard(yearly_data, monthly_data, seasonal_df)
+
+@st.cache_data(show_spinner=False)
+def build_district_chart(_df, districts_key, years_key):
+    """Build the district bar chart for the given selections, memoized per selection"""
+    filtered_data = filter_events(_df, districts_key, years_key)
+    # Pre-aggregate so the chart receives <=22 rows instead of raw events
+    counts = filtered_data['district'].value_counts()
+    district_counts = counts[counts > 0].rename_axis('district').reset_index(name='count')
+    return vis.create_district_bar_chart_from_counts(district_counts)
+
+def commit_selection_change():
+    """
+    Rerun the app only when the selection actually changed
+
+    Interactions that leave the committed selection unchanged (e.g. a
+    widget event echoing the current state) skip the rerun; any real
+    change always triggers exactly one.
+    """
+    new_state = (tuple(sorted(st.session_state.selected_districts)),
+                 tuple(sorted(st.session_state.selected_years)))
+    if new_state == st.session_state.get('_last_committed'):
+        return
+
+    st.session_state._last_committed = new_state
+    # Selections feed both fragments (map styling and charts), so a real
+    # change escalates to a full app rerun
+    st.rerun(scope="app")
 
 # Main function
 def main():
@@ -129,16 +260,15 @@ def main():
     
     # Load data with loading spinner
     with st.spinner("Loading data..."):
-        geojson_data, districts_dict, fire_events_df = load_data()
+        geojson_data, districts_dict, fire_events_df, agg_cube = load_data()
     
     # If data loading fails, show error
     if geojson_data is None or fire_events_df.empty:
         st.error("Failed to load data. Please check the data files and try again.")
         return
     
-    # Get available districts and years
-    districts = dp.get_district_list(fire_events_df)
-    years = dp.get_year_list(fire_events_df)
+    # Get available districts and years (computed once per dataframe)
+    districts, years = load_metadata(fire_events_df)
     
     # Setup session state for selections
     if 'selected_districts' not in st.session_state:
@@ -146,58 +276,49 @@ def main():
     
     if 'selected_years' not in st.session_state:
         st.session_state.selected_years = years.copy()
-    
-    # Define layout - less space for sidebar, more for map
-    left_col, right_col = st.columns([7, 3])
-    
-    # Main content - Map and interactive elements
-    with left_col:
-        # App title & brief description
-        st.title("Punjab Stubble Burning Analysis")
-        st.markdown("""
-        <div style="background-color: #f8f9fa; padding: 15px; border-radius: 8px; border-left: 4px solid #8b4513;">
-            <p style="margin: 0; color: #495057;">Interactive visualization of stubble burning across Punjab districts. 
-            Click on districts or use filters to explore fire events data.</p>
-        </div>
-        """, unsafe_allow_html=True)
 
-        # Create and display map
-        map_obj = mh.render_map(
-            geojson_data, 
-            districts_dict, 
-            fire_events_df.query('year.isin(@st.session_state.selected_years)'),
-            st.session_state.selected_districts
-        )
-        
+    # Fragment-scoped sections: interactions that stay inside one section
+    # rerun only that section instead of the whole script
+
+    @st.fragment
+    def render_map_section():
+        """Map plus district distribution chart"""
+        # Hashable selection keys for the cached helpers
+        districts_key = tuple(sorted(st.session_state.selected_districts))
+        years_key = tuple(sorted(st.session_state.selected_years))
+
+        # Create and display map (cached per selection)
+        map_obj = build_map(geojson_data, districts_dict, fire_events_df,
+                            districts_key, years_key)
+
         # Use st_folium instead of folium_static for improved interaction
         map_data = st_folium(
-            map_obj, 
+            map_obj,
             width="100%",
             height=550,
-            returned_objects=["last_active_drawing", "last_clicked"],
+            returned_objects=["last_clicked"],
             key="folium_map"
         )
-        
+
         # Handle map click events to update selected districts
         if map_data["last_clicked"]:
             if st.session_state.map_clicked is False:
                 st.session_state.map_clicked = True
                 # Get clicked coordinates
                 lat, lng = map_data["last_clicked"]["lat"], map_data["last_clicked"]["lng"]
-                
-                # Find which district was clicked
-                clicked_district = None
-                for district_name, feature in districts_dict.items():
-                    # Skip if not a valid district
-                    if district_name == 'Unknown' or not district_name:
-                        continue
-                        
-                    # Check if point is within district boundary
-                    coordinates = feature["geometry"]["coordinates"][0]
-                    if mh.point_in_polygon((lng, lat), coordinates):
-                        clicked_district = district_name
-                        break
-                
+
+                # Find which district was clicked: O(1) grid lookup first,
+                # STRtree fallback for cells rasterized as empty near borders
+                grid_data = load_district_grid(districts_dict)
+                clicked_district = mh.lookup_district_in_grid(grid_data, lng, lat)
+                if clicked_district is None:
+                    tree, polys, district_names = load_spatial_index(districts_dict)
+                    pt = Point(lng, lat)
+                    for idx in tree.query(pt):
+                        if polys[idx].contains(pt):
+                            clicked_district = district_names[idx]
+                            break
+
                 if clicked_district:
                     st.session_state.clicked_district = clicked_district
                     # Toggle the district selection
@@ -205,28 +326,22 @@ def main():
                         st.session_state.selected_districts.remove(clicked_district)
                     else:
                         st.session_state.selected_districts.append(clicked_district)
-                    st.rerun()
+                    commit_selection_change()
         else:
             st.session_state.map_clicked = False
-        
+
         # Data summary and district distribution
         st.markdown("### Fire Events by District")
-        
-        # Apply filters
-        filtered_data = dp.filter_data(
-            fire_events_df, 
-            selected_districts=st.session_state.selected_districts,
-            selected_years=st.session_state.selected_years
-        )
-        
+
         # District distribution chart
-        district_chart = vis.create_district_bar_chart(filtered_data)
+        district_chart = build_district_chart(fire_events_df, districts_key, years_key)
         st.plotly_chart(district_chart, use_container_width=True)
-    
-    # Sidebar content
-    with right_col:
+
+    @st.fragment
+    def render_analytics():
+        """Filters, statistics and trend charts"""
         st.markdown("## Filters & Analytics")
-        
+
         # Year selection using a more compact UI
         st.markdown("### Year Selection")
         with st.container():
@@ -236,12 +351,12 @@ def main():
                 default=st.session_state.selected_years,
                 key="year_multiselect"
             )
-            
+
             # Update selected years if changed
             if year_selection != st.session_state.selected_years:
                 st.session_state.selected_years = year_selection
-                st.rerun()
-        
+                commit_selection_change()
+
         # District selection
         st.markdown("### District Selection")
         selected_districts = st.multiselect(
@@ -250,12 +365,20 @@ def main():
             default=st.session_state.selected_districts,
             key="district_multiselect"
         )
-        
+
         # Update selected districts if changed via multiselect
         if selected_districts != st.session_state.selected_districts:
             st.session_state.selected_districts = selected_districts
-            st.rerun()
-        
+            commit_selection_change()
+
+        # Shared filtered view and aggregations (all cached per selection)
+        districts_key = tuple(sorted(st.session_state.selected_districts))
+        years_key = tuple(sorted(st.session_state.selected_years))
+        filtered_data = filter_events(fire_events_df, districts_key, years_key)
+        stats = compute_stats(agg_cube, districts_key, years_key)
+        yearly_data = compute_yearly_data(agg_cube, districts_key, years_key)
+        monthly_data = compute_monthly_data(agg_cube, districts_key, years_key)
+
         # Display statistics
         st.markdown("---")
         with st.container():
@@ -266,27 +389,20 @@ def main():
                     title = f"Statistics for Selected Districts ({len(st.session_state.selected_districts)})"
             else:
                 title = "Punjab State Statistics"
-                
-            stats = dp.get_stats(filtered_data)
+
             vis.render_stats_section(stats, title)
-        
-        # Visualizations
+
+        # Visualizations: one combined figure, one payload to the browser
         st.markdown("---")
-        
-        # Yearly trend chart
-        yearly_data = dp.get_yearly_data(filtered_data)
-        yearly_chart = vis.create_yearly_trend_chart(yearly_data)
-        st.plotly_chart(yearly_chart, use_container_width=True)
-        
-        # Monthly distribution chart
-        monthly_data = dp.get_monthly_data(filtered_data)
-        monthly_chart = vis.create_monthly_bar_chart(monthly_data)
-        st.plotly_chart(monthly_chart, use_container_width=True)
-        
-        # Seasonal pattern chart
-        seasonal_chart = vis.create_seasonal_pattern_chart(filtered_data)
-        st.plotly_chart(seasonal_chart, use_container_width=True)
-        
+        dashboard = build_analytics_dashboard(
+            fire_events_df,
+            tuple(yearly_data.itertuples(index=False, name=None)),
+            tuple(monthly_data.itertuples(index=False, name=None)),
+            districts_key,
+            years_key
+        )
+        st.plotly_chart(dashboard, use_container_width=True)
+
         # Display data info
         st.markdown("### Data Summary")
         st.info(f"""
@@ -294,6 +410,26 @@ def main():
         - Fire events: {len(filtered_data)} / {len(fire_events_df)}
         - Time period: {min(years)} - {max(years)}
         """)
+
+    # Define layout - less space for sidebar, more for map
+    left_col, right_col = st.columns([7, 3])
+
+    # Main content - Map and interactive elements
+    with left_col:
+        # App title & brief description
+        st.title("Punjab Stubble Burning Analysis")
+        st.markdown("""
+        <div style="background-color: #f8f9fa; padding: 15px; border-radius: 8px; border-left: 4px solid #8b4513;">
+            <p style="margin: 0; color: #495057;">Interactive visualization of stubble burning across Punjab districts.
+            Click on districts or use filters to explore fire events data.</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        render_map_section()
+
+    # Sidebar content
+    with right_col:
+        render_analytics()
     
     # Footer
     st.markdown("---")
@@ -1,65 +1,236 @@
+import streamlit as st
 import pandas as pd
 import geopandas as gpd
+import numpy as np
 import json
+import calendar
 from datetime import datetime
 import os
 
-def load_geojson(file_path):
+try:
+    import orjson  # C JSON parser, ~2-3x faster on the district GeoJSON
+except ImportError:
+    orjson = None
+
+try:
+    import pyogrio  # GDAL-backed reader; parses GeoJSON in C (ships with geopandas>=1)
+except ImportError:
+    pyogrio = None
+
+# Month number -> abbreviated name, matching the strftime('%b') values
+MONTH_ABBR = {m: calendar.month_abbr[m] for m in range(1, 13)}
+
+# Douglas-Peucker tolerance (degrees) applied to district boundaries;
+# invisible at the app's zoom levels but cuts vertex count 5-20x
+SIMPLIFY_TOLERANCE = 0.005
+
+# CSVs at or above this size are read in chunks so peak memory stays
+# bounded; smaller files take the one-shot multi-threaded Arrow path
+CHUNKED_READ_BYTES = 256 * 1024 * 1024
+CSV_CHUNK_ROWS = 500_000
+
+# cache_resource (not cache_data): the nested dict plus numpy arrays is
+# shared by reference instead of pickled per access
+@st.cache_resource(show_spinner=False)
+def load_geojson(file_path, tolerance=SIMPLIFY_TOLERANCE):
     """
     Load and process GeoJSON data for Punjab districts
-    
+
+    Boundaries are simplified with a topology-preserving Douglas-Peucker
+    pass; the simplified file is cached on disk keyed by source mtime and
+    tolerance so the pass runs once per source change.
+
     Args:
         file_path (str): Path to the GeoJSON file
-        
+        tolerance (float): Simplification tolerance in degrees; None or 0
+            loads the file as-is
+
     Returns:
         dict: Processed GeoJSON data
     """
     try:
-        with open(file_path, 'r') as f:
-            geojson_data = json.load(f)
-        
-        # Create a dictionary to store district information
-        districts = {}
-        for feature in geojson_data['features']:
-            district_name = feature['properties']['district']
-            districts[district_name] = feature
-            
-        return geojson_data, districts
+        geojson_data = _load_simplified(file_path, tolerance)
+        return geojson_data, _districts_from_raw(geojson_data)
     except Exception as e:
         print(f"Error loading GeoJSON: {e}")
         return None, {}
 
+def _parse_geojson_bytes(raw):
+    """Parse GeoJSON bytes with orjson when available"""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def _load_simplified(file_path, tolerance):
+    """
+    Parse the GeoJSON, simplifying through a disk cache
+
+    The cache file lives next to the source, embeds the tolerance in its
+    name and is rebuilt whenever the source is newer.
+
+    Args:
+        file_path (str): Path to the GeoJSON file
+        tolerance (float): Simplification tolerance in degrees
+
+    Returns:
+        dict: Parsed (and possibly simplified) GeoJSON data
+    """
+    if not tolerance:
+        with open(file_path, 'rb') as f:
+            return _parse_geojson_bytes(f.read())
+
+    cache_path = f"{os.path.splitext(file_path)[0]}.simplified-{tolerance}.geojson"
+    if (os.path.exists(cache_path)
+            and os.path.getmtime(cache_path) >= os.path.getmtime(file_path)):
+        with open(cache_path, 'rb') as f:
+            return _parse_geojson_bytes(f.read())
+
+    from shapely.geometry import shape, mapping
+
+    if pyogrio is not None:
+        # C-level parse straight into shapely geometries, skipping the
+        # json-dict -> shape() conversion entirely
+        gdf = pyogrio.read_dataframe(file_path)
+        geoms = gdf.geometry.simplify(tolerance, preserve_topology=True)
+        prop_cols = [c for c in gdf.columns if c != 'geometry']
+        features = []
+        for props, geom in zip(gdf[prop_cols].to_dict('records'), geoms):
+            props = {k: (v.item() if hasattr(v, 'item') else v) for k, v in props.items()}
+            features.append({'type': 'Feature', 'properties': props,
+                             'geometry': mapping(geom)})
+        geojson_data = {'type': 'FeatureCollection', 'features': features}
+    else:
+        with open(file_path, 'rb') as f:
+            geojson_data = _parse_geojson_bytes(f.read())
+        for feature in geojson_data['features']:
+            geom = shape(feature['geometry']).simplify(tolerance, preserve_topology=True)
+            feature['geometry'] = mapping(geom)
+
+    # Best-effort cache write; a read-only filesystem just re-simplifies
+    try:
+        if orjson is not None:
+            with open(cache_path, 'wb') as f:
+                f.write(orjson.dumps(geojson_data))
+        else:
+            with open(cache_path, 'w') as f:
+                json.dump(geojson_data, f, separators=(',', ':'))
+    except OSError:
+        pass
+
+    return geojson_data
+
+def _districts_from_raw(geojson_data):
+    """
+    Build the district name -> feature mapping from parsed GeoJSON
+
+    Args:
+        geojson_data (dict): Parsed GeoJSON data
+
+    Returns:
+        dict: District features keyed by district name
+    """
+    districts = {}
+    for feature in geojson_data['features']:
+        district_name = feature['properties']['district']
+        # Preconvert the exterior ring(s) to contiguous float64 arrays so
+        # point-in-polygon tests skip per-click Python list walking
+        geometry = feature['geometry']
+        if geometry['type'] == 'Polygon':
+            rings = [geometry['coordinates'][0]]
+        elif geometry['type'] == 'MultiPolygon':
+            rings = [polygon[0] for polygon in geometry['coordinates']]
+        else:
+            rings = []
+        # Shallow-copy the feature so the arrays never leak into the
+        # GeoJSON dict folium serializes into the map HTML
+        district_feature = dict(feature)
+        ring_arrays = [np.asarray(ring, dtype=np.float64) for ring in rings]
+        district_feature['_rings'] = [
+            (np.ascontiguousarray(arr[:, 0]), np.ascontiguousarray(arr[:, 1]))
+            for arr in ring_arrays
+        ]
+        # All exterior coordinates as one dense (M, 2) block, for
+        # vectorized bounds/containment reductions
+        district_feature['_poly_np'] = (
+            np.concatenate(ring_arrays) if ring_arrays
+            else np.empty((0, 2), dtype=np.float64)
+        )
+        # Bounding box (minx, miny, maxx, maxy); zoom fitting reduces
+        # over these instead of re-walking the coordinates
+        poly_np = district_feature['_poly_np']
+        district_feature['_bounds'] = (
+            np.concatenate([poly_np.min(axis=0), poly_np.max(axis=0)])
+            if poly_np.size else None
+        )
+        districts[district_name] = district_feature
+    return districts
+
+@st.cache_data(show_spinner=False)
 def load_fire_events(file_path):
     """
     Load and process fire event data from CSV
-    
+
+    A Parquet copy of the processed dataframe is kept next to the CSV so
+    later cold starts skip CSV parsing and dtype conversion entirely.
+
     Args:
         file_path (str): Path to the CSV file
-        
+
     Returns:
         pd.DataFrame: Processed fire event data
     """
     try:
-        # Load CSV data
-        df = pd.read_csv(file_path)
-        
-        # Handle missing values
-        df['district'].fillna('Unknown', inplace=True)
-        
-        # Convert date to datetime
-        df['date'] = pd.to_datetime(df['date'], errors='coerce')
-        
-        # Drop rows with invalid dates
-        df = df.dropna(subset=['date'])
-        
-        # Extract year and month for filtering
-        df['year'] = df['date'].dt.year
-        df['month'] = df['date'].dt.month
-        df['month_name'] = df['date'].dt.strftime('%b')
-        
-        # Filter out rows with missing lat or long
-        df = df.dropna(subset=['lat', 'long'])
-        
+        # Prefer the Parquet cache when it is current
+        parquet_path = os.path.splitext(file_path)[0] + '.parquet'
+        if (os.path.exists(parquet_path)
+                and os.path.getmtime(parquet_path) >= os.path.getmtime(file_path)):
+            return pd.read_parquet(parquet_path)
+
+        # Load CSV data. The pyarrow engine parses multi-threaded and the
+        # explicit dtypes skip inference: category district filters on
+        # integer codes, float32 halves the lat/long footprint. Files too
+        # big for a one-shot read stream through in bounded chunks, each
+        # shrunk (dates coerced, bad rows dropped) before the concat
+        if os.path.getsize(file_path) >= CHUNKED_READ_BYTES:
+            chunks = []
+            reader = pd.read_csv(
+                file_path,
+                chunksize=CSV_CHUNK_ROWS,
+                dtype={'lat': 'float32', 'long': 'float32'},
+            )
+            for chunk in reader:
+                chunk['date'] = pd.to_datetime(chunk['date'], errors='coerce')
+                chunks.append(chunk.dropna(subset=['date', 'lat', 'long']))
+            df = pd.concat(chunks, ignore_index=True)
+            df['district'] = df['district'].astype('category')
+        else:
+            df = pd.read_csv(
+                file_path,
+                engine='pyarrow',
+                parse_dates=['date'],
+                dtype={'district': 'category', 'lat': 'float32', 'long': 'float32'},
+            )
+
+        # Handle missing values; 'Unknown' has to exist as a category
+        # before it can be used as the fill value
+        if 'Unknown' not in df['district'].cat.categories:
+            df['district'] = df['district'].cat.add_categories('Unknown')
+        df['district'] = df['district'].fillna('Unknown')
+
+        # Drop rows with invalid dates or missing coordinates
+        df = df.dropna(subset=['date', 'lat', 'long'])
+
+        # Extract year and month for filtering; int16 is plenty for years
+        # and halves the bytes scanned by every year mask
+        df['year'] = df['date'].dt.year.astype(np.int16)
+        df['month'] = df['date'].dt.month.astype(np.int8)
+        df['month_name'] = df['date'].dt.strftime('%b').astype('category')
+
+        # Best-effort Parquet cache for the next cold start; zstd keeps it
+        # small and the categorical district column dictionary-encodes
+        try:
+            df.to_parquet(parquet_path, compression='zstd')
+        except Exception:
+            pass
+
         return df
     except Exception as e:
         print(f"Error loading CSV: {e}")
@@ -77,17 +248,30 @@ def filter_data(df, selected_districts=None, selected_years=None):
     Returns:
         pd.DataFrame: Filtered data
     """
-    filtered_df = df.copy()
-    
+    # Both masks are built against the full frame and combined with &, so
+    # the rows materialize once; no up-front copy either, since boolean
+    # indexing already returns a new frame
+    mask = None
+
     # Filter by district if selected
     if selected_districts and len(selected_districts) > 0:
-        filtered_df = filtered_df[filtered_df['district'].isin(selected_districts)]
-    
+        district_col = df['district']
+        if isinstance(district_col.dtype, pd.CategoricalDtype):
+            # Compare int8 category codes instead of hashing strings
+            selected_codes = district_col.cat.categories.get_indexer(list(selected_districts))
+            mask = np.isin(district_col.cat.codes.to_numpy(), selected_codes)
+        else:
+            mask = district_col.isin(selected_districts).to_numpy()
+
     # Filter by year if selected
     if selected_years and len(selected_years) > 0:
-        filtered_df = filtered_df[filtered_df['year'].isin(selected_years)]
-    
-    return filtered_df
+        years_arr = np.asarray(list(selected_years), dtype=df['year'].dtype)
+        year_mask = np.isin(df['year'].to_numpy(), years_arr)
+        mask = year_mask if mask is None else mask & year_mask
+
+    if mask is None:
+        return df
+    return df[mask]
 
 def get_district_list(df):
     """
@@ -118,13 +302,163 @@ def get_year_list(df):
     """
     return sorted(df['year'].unique().tolist())
 
+def build_agg_cube(df):
+    """
+    Precompute fire event counts as a dense (district, year, month) cube
+
+    One bincount over a flattened index produces a D x Y x 12 int32
+    array (a few kilobytes), so every downstream aggregation becomes an
+    axis reduction over contiguous ints instead of a group-by over the
+    full event dataframe.
+
+    Args:
+        df (pd.DataFrame): Fire event data
+
+    Returns:
+        tuple: (counts array of shape (D, Y, 12), district names, year_min)
+    """
+    district_names = list(df['district'].cat.categories)
+    n_districts = len(district_names)
+
+    years = df['year'].to_numpy()
+    year_min = int(years.min())
+    n_years = int(years.max()) - year_min + 1
+
+    codes_d = df['district'].cat.codes.to_numpy().astype(np.int64)
+    codes_y = years.astype(np.int64) - year_min
+    codes_m = df['month'].to_numpy().astype(np.int64) - 1
+    flat = (codes_d * n_years + codes_y) * 12 + codes_m
+    counts = np.bincount(flat, minlength=n_districts * n_years * 12)
+    return (counts.reshape(n_districts, n_years, 12).astype(np.int32),
+            district_names, year_min)
+
+def _slice_cube(agg_cube, selected_districts=None, selected_years=None):
+    """
+    Reduce the cube to a (years, months) count matrix for the selection
+
+    Args:
+        agg_cube (tuple): Output of build_agg_cube
+        selected_districts (list): List of selected district names
+        selected_years (list): List of selected years
+
+    Returns:
+        tuple: (counts array of shape (Y, 12), year_min)
+    """
+    counts, district_names, year_min = agg_cube
+
+    if selected_districts and len(selected_districts) > 0:
+        name_to_idx = {name: i for i, name in enumerate(district_names)}
+        rows = [name_to_idx[d] for d in selected_districts if d in name_to_idx]
+        counts = counts[rows].sum(axis=0)
+    else:
+        counts = counts.sum(axis=0)
+
+    if selected_years and len(selected_years) > 0:
+        keep = np.zeros(counts.shape[0], dtype=bool)
+        for year in selected_years:
+            offset = int(year) - year_min
+            if 0 <= offset < counts.shape[0]:
+                keep[offset] = True
+        counts = np.where(keep[:, None], counts, 0)
+
+    return counts, year_min
+
+def get_yearly_data_from_cube(agg_cube, selected_districts=None, selected_years=None):
+    """
+    Aggregate the precomputed cube by year for the line chart
+
+    Args:
+        agg_cube (tuple): Output of build_agg_cube
+        selected_districts (list): List of selected district names
+        selected_years (list): List of selected years
+
+    Returns:
+        pd.DataFrame: Yearly aggregated data
+    """
+    counts, year_min = _slice_cube(agg_cube, selected_districts, selected_years)
+    # Fix the accumulator dtype: numpy would otherwise promote the int32
+    # cube to int64 on the way into the chart
+    year_totals = counts.sum(axis=1, dtype=np.int32)
+    observed = np.flatnonzero(year_totals)
+    return pd.DataFrame({'year': (year_min + observed).astype(np.int16),
+                         'count': year_totals[observed]})
+
+def get_monthly_data_from_cube(agg_cube, selected_districts=None, selected_years=None):
+    """
+    Aggregate the precomputed cube by month for the bar chart
+
+    Args:
+        agg_cube (tuple): Output of build_agg_cube
+        selected_districts (list): List of selected district names
+        selected_years (list): List of selected years
+
+    Returns:
+        pd.DataFrame: Monthly aggregated data
+    """
+    counts, _ = _slice_cube(agg_cube, selected_districts, selected_years)
+    month_totals = counts.sum(axis=0, dtype=np.int32)
+    observed = np.flatnonzero(month_totals)
+    months = (observed + 1).astype(np.int8)
+    return pd.DataFrame({'month': months,
+                         'month_name': [MONTH_ABBR[m] for m in months],
+                         'count': month_totals[observed]})
+
+def get_stats_from_cube(agg_cube, selected_districts=None, selected_years=None):
+    """
+    Get statistics for the given selections from the precomputed cube
+
+    Args:
+        agg_cube (tuple): Output of build_agg_cube
+        selected_districts (list): List of selected district names
+        selected_years (list): List of selected years
+
+    Returns:
+        dict: Statistics
+    """
+    counts, year_min = _slice_cube(agg_cube, selected_districts, selected_years)
+
+    total_events = int(counts.sum())
+    year_totals = counts.sum(axis=1)
+    month_totals = counts.sum(axis=0)
+
+    yearly_counts = {year_min + int(i): int(year_totals[i])
+                     for i in np.flatnonzero(year_totals)}
+    monthly_counts = pd.DataFrame({
+        'month': np.flatnonzero(month_totals) + 1,
+        'month_name': [MONTH_ABBR[m + 1] for m in np.flatnonzero(month_totals)],
+        'count': month_totals[np.flatnonzero(month_totals)],
+    })
+
+    peak_month = MONTH_ABBR[int(month_totals.argmax()) + 1] if total_events else "N/A"
+    peak_year = year_min + int(year_totals.argmax()) if total_events else "N/A"
+
+    return {
+        'total_events': total_events,
+        'yearly_counts': yearly_counts,
+        'monthly_counts': monthly_counts,
+        'peak_month': peak_month,
+        'peak_year': peak_year
+    }
+
+def _df_fingerprint(df):
+    """
+    O(1) cache key for a fire-event dataframe
+
+    Row count plus first/last date identifies any slice of the loaded
+    dataset without hashing the full frame contents.
+    """
+    if df.empty:
+        return (0,)
+    return (len(df), df['date'].iat[0], df['date'].iat[-1])
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _df_fingerprint})
 def get_monthly_data(df):
     """
     Aggregate data by month for bar chart
-    
+
     Args:
         df (pd.DataFrame): Fire event data
-        
+
     Returns:
         pd.DataFrame: Monthly aggregated data
     """
@@ -132,13 +466,14 @@ def get_monthly_data(df):
     monthly_data = monthly_data.sort_values('month')
     return monthly_data
 
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _df_fingerprint})
 def get_yearly_data(df):
     """
     Aggregate data by year for line chart
-    
+
     Args:
         df (pd.DataFrame): Fire event data
-        
+
     Returns:
         pd.DataFrame: Yearly aggregated data
     """
@@ -146,37 +481,48 @@ def get_yearly_data(df):
     yearly_data = yearly_data.sort_values('year')
     return yearly_data
 
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _df_fingerprint})
 def get_stats(df, district=None):
     """
     Get statistics for the given district or whole state
-    
+
     Args:
         df (pd.DataFrame): Fire event data
         district (str, optional): District name
-        
+
     Returns:
         dict: Statistics
     """
     filtered_df = df
     if district:
         filtered_df = df[df['district'] == district]
-    
+
     total_events = len(filtered_df)
-    yearly_counts = filtered_df.groupby('year').size().to_dict()
-    monthly_counts = filtered_df.groupby(['month', 'month_name']).size().reset_index(name='count')
-    
-    # Find peak month and year
-    if not monthly_counts.empty:
-        peak_month_idx = monthly_counts['count'].idxmax()
-        peak_month = monthly_counts.loc[peak_month_idx, 'month_name']
+
+    # year and month are small non-negative ints post-downcast, so the
+    # counts come from single-pass bincounts instead of groupby objects
+    if total_events:
+        years = filtered_df['year'].to_numpy()
+        year_min = int(years.min())
+        year_counts = np.bincount(years - year_min)
+        yearly_counts = {year_min + i: int(c)
+                         for i, c in enumerate(year_counts) if c}
+        peak_year = year_min + int(year_counts.argmax())
+
+        month_counts = np.bincount(filtered_df['month'].to_numpy(), minlength=13)
+        months = np.flatnonzero(month_counts)
+        monthly_counts = pd.DataFrame({
+            'month': months,
+            'month_name': [MONTH_ABBR[m] for m in months],
+            'count': month_counts[months],
+        })
+        peak_month = MONTH_ABBR[int(month_counts.argmax())]
     else:
+        yearly_counts = {}
+        monthly_counts = pd.DataFrame(columns=['month', 'month_name', 'count'])
         peak_month = "N/A"
-    
-    if yearly_counts:
-        peak_year = max(yearly_counts.items(), key=lambda x: x[1])[0]
-    else:
         peak_year = "N/A"
-    
+
     return {
         'total_events': total_events,
         'yearly_counts': yearly_counts,
@@ -1,38 +1,207 @@
 import folium
-from folium.plugins import MarkerCluster
+from folium.plugins import MarkerCluster, FastMarkerCluster
 from streamlit_folium import folium_static
+from folium.template import Template
 import branca.colormap as cm
+import copy
+import json
 import pandas as pd
+import geopandas as gpd
 import numpy as np
+import shapely
+from shapely.geometry import shape
+
+try:
+    from numba import njit  # optional: JIT the ray-cast kernel when available
+except ImportError:
+    njit = None
+
+try:
+    import orjson  # C JSON serializer for the marker payload
+except ImportError:
+    orjson = None
+
+def _pip_kernel(px, py, xs, ys):
+    """
+    Ray-cast a single point against one polygon ring (scalar loop)
+
+    Compiled with numba when it is installed; callers should otherwise
+    prefer _pip_kernel_numpy, which vectorizes the same test.
+    """
+    n = xs.size
+    inside = False
+    j = n - 1
+    for i in range(n):
+        if ((ys[i] > py) != (ys[j] > py)) and \
+                (px < (xs[j] - xs[i]) * (py - ys[i]) / (ys[j] - ys[i]) + xs[i]):
+            inside = not inside
+        j = i
+    return inside
+
+if njit is not None:
+    _pip_kernel = njit(cache=True, fastmath=True)(_pip_kernel)
+
+def _ring_arrays(polygon):
+    """Coerce a polygon spec into contiguous (xs, ys) float64 arrays"""
+    if isinstance(polygon, tuple) and len(polygon) == 2:
+        return polygon
+    coords = np.asarray(polygon, dtype=np.float64)
+    return np.ascontiguousarray(coords[:, 0]), np.ascontiguousarray(coords[:, 1])
+
+def points_in_polygon(lons, lats, polygon):
+    """
+    Ray-cast many points against one polygon ring in a single pass
+
+    Broadcasts the edge-crossing test to an (N, V) boolean matrix and
+    parity-reduces it along the edge axis, so classifying N points costs
+    a handful of C array ops instead of N Python loops.
+
+    Args:
+        lons (array-like): Longitudes, shape (N,)
+        lats (array-like): Latitudes, shape (N,)
+        polygon: Either a (xs, ys) pair of float64 arrays (as precomputed
+            on district features at load time) or a list of (lon, lat)
+            points forming the polygon
+
+    Returns:
+        np.ndarray: Boolean array of shape (N,), True where inside
+    """
+    xs, ys = _ring_arrays(polygon)
+    px = np.asarray(lons, dtype=np.float64).reshape(-1, 1)
+    py = np.asarray(lats, dtype=np.float64).reshape(-1, 1)
+
+    x2 = np.roll(xs, -1)
+    y2 = np.roll(ys, -1)
+    crosses = (ys > py) != (y2 > py)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xinters = (x2 - xs) * (py - ys) / (y2 - ys) + xs
+    return (np.count_nonzero(crosses & (px < xinters), axis=1) & 1).astype(bool)
 
 def point_in_polygon(point, polygon):
     """
     Check if a point is inside a polygon using the ray casting algorithm
-    
+
     Args:
         point (tuple): (lon, lat) coordinates
-        polygon (list): List of (lon, lat) points forming the polygon
-        
+        polygon: Either a (xs, ys) pair of float64 arrays (as precomputed
+            on district features at load time) or a list of (lon, lat)
+            points forming the polygon
+
     Returns:
         bool: True if point is inside polygon, False otherwise
     """
     x, y = point
-    n = len(polygon)
-    inside = False
-    
-    p1x, p1y = polygon[0]
-    for i in range(1, n + 1):
-        p2x, p2y = polygon[i % n]
-        if y > min(p1y, p2y):
-            if y <= max(p1y, p2y):
-                if x <= max(p1x, p2x):
-                    if p1y != p2y:
-                        xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                        if p1x == p2x or x <= xinters:
-                            inside = not inside
-        p1x, p1y = p2x, p2y
-    
-    return inside
+
+    if njit is not None:
+        xs, ys = _ring_arrays(polygon)
+        return bool(_pip_kernel(x, y, xs, ys))
+    return bool(points_in_polygon([x], [y], polygon)[0])
+
+def assign_districts(fire_df, districts_dict):
+    """
+    Assign every fire event to its district with one spatial join
+
+    geopandas.sjoin runs an R-tree lookup plus vectorized containment in
+    a single C call, replacing any per-row point-in-polygon iteration.
+    Events outside every district come back as NaN; callers decide the
+    fill value.
+
+    Args:
+        fire_df (pd.DataFrame): Fire event data with lat/long columns
+        districts_dict (dict): Dictionary of district features
+
+    Returns:
+        pd.Series: District name per event, aligned to fire_df.index
+    """
+    names = []
+    geoms = []
+    for district_name, feature in districts_dict.items():
+        if district_name == 'Unknown' or not district_name:
+            continue
+        names.append(district_name)
+        geoms.append(shape(feature['geometry']))
+    districts_gdf = gpd.GeoDataFrame(
+        {'_district': names}, geometry=geoms, crs='EPSG:4326')
+
+    points = gpd.GeoDataFrame(
+        geometry=gpd.points_from_xy(fire_df['long'], fire_df['lat']),
+        index=fire_df.index,
+        crs='EPSG:4326')
+    joined = gpd.sjoin(points, districts_gdf, predicate='within', how='left')
+
+    # A point on a shared boundary can match twice; keep the first hit
+    joined = joined[~joined.index.duplicated(keep='first')]
+    return joined['_district'].reindex(fire_df.index)
+
+def build_district_grid(districts_dict, resolution=2048):
+    """
+    Rasterize the district polygons into a coarse lookup grid
+
+    Each cell stores the index of the district containing its center
+    (255 = no district), so resolving a click becomes a single array
+    lookup instead of a polygon containment test. Cells are tested with
+    shapely's vectorized contains_xy, one district bbox at a time.
+
+    Args:
+        districts_dict (dict): Dictionary of district features
+        resolution (int): Grid cells per axis
+
+    Returns:
+        tuple: uint8 grid, (minx, miny, maxx, maxy) bounds, district names
+    """
+    names = []
+    geoms = []
+    for district_name, feature in districts_dict.items():
+        if district_name == 'Unknown' or not district_name:
+            continue
+        names.append(district_name)
+        geoms.append(shape(feature['geometry']))
+
+    all_bounds = np.array([g.bounds for g in geoms])
+    minx, miny = all_bounds[:, 0].min(), all_bounds[:, 1].min()
+    maxx, maxy = all_bounds[:, 2].max(), all_bounds[:, 3].max()
+
+    dx = (maxx - minx) / resolution
+    dy = (maxy - miny) / resolution
+    cell_xs = minx + (np.arange(resolution) + 0.5) * dx
+    cell_ys = miny + (np.arange(resolution) + 0.5) * dy
+
+    grid = np.full((resolution, resolution), 255, dtype=np.uint8)
+    for idx, geom in enumerate(geoms):
+        gminx, gminy, gmaxx, gmaxy = geom.bounds
+        c0 = max(int((gminx - minx) / dx), 0)
+        c1 = min(int((gmaxx - minx) / dx) + 1, resolution)
+        r0 = max(int((gminy - miny) / dy), 0)
+        r1 = min(int((gmaxy - miny) / dy) + 1, resolution)
+        if c1 <= c0 or r1 <= r0:
+            continue
+        mesh_x, mesh_y = np.meshgrid(cell_xs[c0:c1], cell_ys[r0:r1])
+        mask = shapely.contains_xy(geom, mesh_x.ravel(), mesh_y.ravel())
+        grid[r0:r1, c0:c1][mask.reshape(mesh_x.shape)] = idx
+
+    return grid, (minx, miny, maxx, maxy), names
+
+def lookup_district_in_grid(grid_data, lng, lat):
+    """
+    Resolve a clicked point to a district via the rasterized grid
+
+    Args:
+        grid_data (tuple): Output of build_district_grid
+        lng (float): Longitude of the click
+        lat (float): Latitude of the click
+
+    Returns:
+        str: District name, or None if the cell is outside every district
+    """
+    grid, (minx, miny, maxx, maxy), names = grid_data
+    if not (minx <= lng < maxx and miny <= lat < maxy):
+        return None
+
+    rows, cols = grid.shape
+    col = int((lng - minx) / (maxx - minx) * cols)
+    row = int((lat - miny) / (maxy - miny) * rows)
+    idx = grid[row, col]
+    return names[idx] if idx != 255 else None
 
 def create_base_map():
     """
@@ -103,12 +272,15 @@ def add_district_layers(m, geojson_data, districts_dict, selected_districts=None
             'fillOpacity': 0.5
         }
     
-    # Add GeoJSON layer with districts
+    # Add GeoJSON layer with districts; smooth_factor lets Leaflet drop
+    # sub-pixel vertices when drawing at lower zooms, on top of the
+    # simplified source geometry
     district_layer = folium.GeoJson(
         geojson_data,
         name='Districts',
         style_function=style_function,
         highlight_function=highlight_function,
+        smooth_factor=2,
         tooltip=folium.GeoJsonTooltip(
             fields=['district'],
             aliases=['District:'],
@@ -120,110 +292,219 @@ def add_district_layers(m, geojson_data, districts_dict, selected_districts=None
     
     return m
 
+# Cluster icon shared by the marker layer
+_CLUSTER_ICON_JS = """
+function(cluster) {
+    var count = cluster.getChildCount();
+    var size = 35;
+    if (count > 100) {
+        size = 45;
+    } else if (count > 50) {
+        size = 40;
+    }
+
+    return L.divIcon({
+        html: '<div style="background-color: rgba(255, 0, 0, 0.7); color: white; border-radius: 50%; width: ' + size + 'px; height: ' + size + 'px; line-height: ' + size + 'px; text-align: center; font-weight: bold;">' + count + '</div>',
+        className: 'marker-cluster-custom',
+        iconSize: L.point(size, size)
+    });
+}
+"""
+
+# Builds one circle marker per data row client-side; row[3] is an index
+# into the fireDistricts name table injected once per page
+_MARKER_CALLBACK_JS = """
+function (row) {
+    var marker = L.circleMarker([row[0], row[1]], {
+        radius: 5, color: 'red', fill: true, fillColor: 'red',
+        fillOpacity: 0.7, weight: 1.5
+    });
+    marker.bindPopup(
+        '<div style="font-family: Arial, sans-serif; min-width: 180px;">' +
+        '<h4 style="margin: 0; color: #d32f2f; border-bottom: 1px solid #eee; padding-bottom: 5px;">Fire Event</h4>' +
+        '<p style="margin: 5px 0;"><b>Date:</b> ' + row[2] + '</p>' +
+        '<p style="margin: 5px 0;"><b>District:</b> ' + window.fireDistricts[row[3]] + '</p>' +
+        '<p style="margin: 5px 0;"><b>Location:</b> ' + row[0].toFixed(4) + ', ' + row[1].toFixed(4) + '</p>' +
+        '</div>',
+        {maxWidth: 300});
+    return marker;
+}
+"""
+
+class _RawDataFastMarkerCluster(FastMarkerCluster):
+    """
+    FastMarkerCluster whose data payload is an already-serialized string
+
+    The stock template pipes the Python list through jinja's tojson
+    filter (stdlib json); this variant embeds a pre-encoded JSON literal
+    verbatim, so the payload can be produced by orjson instead.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                {{ this.callback }}
+
+                var data = {{ this.data }};
+                var cluster = L.markerClusterGroup({{ this.options|tojavascript }});
+                {%- if this.icon_create_function is not none %}
+                cluster.options.iconCreateFunction =
+                    {{ this.icon_create_function.strip() }};
+                {%- endif %}
+
+                for (var i = 0; i < data.length; i++) {
+                    var row = data[i];
+                    var marker = callback(row);
+                    marker.addTo(cluster);
+                }
+
+                cluster.addTo({{ this._parent.get_name() }});
+                return cluster;
+            })();
+        {% endmacro %}"""
+    )
+
+    def __init__(self, data, **kwargs):
+        # Skip the parent's per-row location validation; data is a
+        # JSON string, not a list of rows
+        super().__init__([], **kwargs)
+        self.data = data
+
 def add_fire_markers(m, fire_data):
     """
     Add fire event markers to the map
-    
+
+    The events go into the page as a single JS data array consumed by a
+    FastMarkerCluster callback, so Leaflet ingests all points at once
+    instead of folium generating one Python marker object per event.
+
     Args:
         m (folium.Map): Map object
         fire_data (pd.DataFrame): Filtered fire event data
-        
+
     Returns:
         folium.Map: Map with fire markers
     """
-    # Create a marker cluster for better performance with many points
-    marker_cluster = MarkerCluster(
-        name='Fire Events',
-        icon_create_function="""
-        function(cluster) {
-            var count = cluster.getChildCount();
-            var size = 35;
-            if (count > 100) {
-                size = 45;
-            } else if (count > 50) {
-                size = 40;
-            }
-            
-            return L.divIcon({
-                html: '<div style="background-color: rgba(255, 0, 0, 0.7); color: white; border-radius: 50%; width: ' + size + 'px; height: ' + size + 'px; line-height: ' + size + 'px; text-align: center; font-weight: bold;">' + count + '</div>',
-                className: 'marker-cluster-custom',
-                iconSize: L.point(size, size)
-            });
-        }
-        """
-    ).add_to(m)
-    
-    # Add each fire event as a marker
-    for _, row in fire_data.iterrows():
-        popup_html = f"""
-        <div style="font-family: Arial, sans-serif; min-width: 180px;">
-            <h4 style="margin: 0; color: #d32f2f; border-bottom: 1px solid #eee; padding-bottom: 5px;">Fire Event</h4>
-            <p style="margin: 5px 0;"><b>Date:</b> {row['date'].strftime('%Y-%m-%d')}</p>
-            <p style="margin: 5px 0;"><b>District:</b> {row['district']}</p>
-            <p style="margin: 5px 0;"><b>Location:</b> {row['lat']:.4f}, {row['long']:.4f}</p>
-        </div>
-        """
-        
-        folium.CircleMarker(
-            location=[row['lat'], row['long']],
-            radius=5,
-            color='red',
-            fill=True,
-            fill_color='red',
-            fill_opacity=0.7,
-            weight=1.5,
-            popup=folium.Popup(popup_html, max_width=300)
-        ).add_to(marker_cluster)
-    
+    # Pull the columns out once as plain arrays; vectorized strftime
+    # happens in C instead of per row
+    lats = fire_data['lat'].to_numpy()
+    lons = fire_data['long'].to_numpy()
+    dates = fire_data['date'].dt.strftime('%Y-%m-%d').to_numpy()
+
+    # Each row carries the int8 category code; the name table goes into
+    # the page once instead of one district string per marker
+    district_col = fire_data['district']
+    if not isinstance(district_col.dtype, pd.CategoricalDtype):
+        district_col = district_col.astype('category')
+    codes = district_col.cat.codes.to_numpy()
+    names = list(district_col.cat.categories)
+    names_js = (orjson.dumps(names).decode() if orjson is not None
+                else json.dumps(names))
+    m.get_root().html.add_child(folium.Element(
+        f'<script>window.fireDistricts = {names_js};</script>'))
+
+    data = list(zip(lats.tolist(), lons.tolist(), dates.tolist(), codes.tolist()))
+
+    if orjson is not None:
+        # Pre-encode the payload with orjson; the cluster class embeds
+        # the resulting literal instead of re-serializing with stdlib json
+        cluster = _RawDataFastMarkerCluster(
+            orjson.dumps(data).decode(),
+            name='Fire Events',
+            callback=_MARKER_CALLBACK_JS,
+            icon_create_function=_CLUSTER_ICON_JS
+        )
+    else:
+        cluster = FastMarkerCluster(
+            data,
+            name='Fire Events',
+            callback=_MARKER_CALLBACK_JS,
+            icon_create_function=_CLUSTER_ICON_JS
+        )
+    cluster.add_to(m)
+
     return m
 
-def zoom_to_districts(m, geojson_data, selected_districts):
+def _selection_bounds(districts_dict, selected_districts):
+    """
+    Bounding box (minx, miny, maxx, maxy) covering the selected districts
+
+    Reduces the per-district boxes precomputed at load time; returns
+    None when no selected district resolves to a feature.
+    """
+    boxes = []
+    for district_name in selected_districts:
+        feature = districts_dict.get(district_name)
+        if feature is None:
+            continue
+        bounds = feature.get('_bounds')
+        if bounds is None:
+            # Fall back to the shapely bounds of the raw geometry
+            bounds = np.asarray(shape(feature['geometry']).bounds)
+        boxes.append(bounds)
+
+    if not boxes:
+        return None
+
+    # Reduce the (D, 4) bounds table instead of walking any coordinates
+    sel = np.vstack(boxes)
+    return sel[:, 0].min(), sel[:, 1].min(), sel[:, 2].max(), sel[:, 3].max()
+
+def clip_to_districts(fire_data, districts_dict, selected_districts):
+    """
+    Keep only fire events inside the selected districts' bounding box
+
+    The map is zoomed to that box anyway, so events outside it would be
+    serialized into the page without ever being visible. One vectorized
+    comparison sweep over the coordinate arrays does the cut.
+
+    Args:
+        fire_data (pd.DataFrame): Fire event data
+        districts_dict (dict): Dictionary of district features
+        selected_districts (list): List of selected district names
+
+    Returns:
+        pd.DataFrame: Events within the padded selection box
+    """
+    bounds = _selection_bounds(districts_dict, selected_districts)
+    if bounds is None:
+        return fire_data
+
+    min_lon, min_lat, max_lon, max_lat = bounds
+    # Same padding as the zoom fit, so edge markers still show
+    padding = 0.05
+    lons = fire_data['long'].to_numpy()
+    lats = fire_data['lat'].to_numpy()
+    mask = ((lons >= min_lon - padding) & (lons <= max_lon + padding)
+            & (lats >= min_lat - padding) & (lats <= max_lat + padding))
+    return fire_data[mask]
+
+def zoom_to_districts(m, districts_dict, selected_districts):
     """
     Zoom the map to fit the selected districts
-    
+
     Args:
         m (folium.Map): Map object
-        geojson_data (dict): GeoJSON data
+        districts_dict (dict): Dictionary of district features
         selected_districts (list): List of selected district names
-        
+
     Returns:
         folium.Map: Map zoomed to selected districts
     """
     if not selected_districts:
         return m
-    
-    # Get coordinates of all selected districts
-    all_coords = []
-    for feature in geojson_data['features']:
-        district_name = feature['properties']['district']
-        if district_name in selected_districts:
-            if feature['geometry']['type'] == 'Polygon':
-                coords = feature['geometry']['coordinates'][0]
-                all_coords.extend(coords)
-            elif feature['geometry']['type'] == 'MultiPolygon':
-                for polygon in feature['geometry']['coordinates']:
-                    all_coords.extend(polygon[0])
-    
-    if not all_coords:
+
+    bounds = _selection_bounds(districts_dict, selected_districts)
+    if bounds is None:
         return m
-    
-    # Get bounds
-    lats = [coord[1] for coord in all_coords]
-    lons = [coord[0] for coord in all_coords]
-    
-    min_lat, max_lat = min(lats), max(lats)
-    min_lon, max_lon = min(lons), max(lons)
-    
-    # Add padding
+    min_lon, min_lat, max_lon, max_lat = bounds
+
+    # Add padding and fit bounds
     padding = 0.05
-    min_lat -= padding
-    max_lat += padding
-    min_lon -= padding
-    max_lon += padding
-    
-    # Fit bounds
-    m.fit_bounds([[min_lat, min_lon], [max_lat, max_lon]])
-    
+    m.fit_bounds([[min_lat - padding, min_lon - padding],
+                  [max_lat + padding, max_lon + padding]])
+
     return m
 
 def add_legend(m):
@@ -259,36 +540,46 @@ def add_legend(m):
     
     return m
 
-def render_map(geojson_data, districts_dict, fire_data, selected_districts=None):
+def render_map(geojson_data, districts_dict, fire_data, selected_districts=None,
+               base_map=None):
     """
     Render the full map with all components
-    
+
     Args:
         geojson_data (dict): GeoJSON data
         districts_dict (dict): Dictionary of district features
         fire_data (pd.DataFrame): Filtered fire event data
         selected_districts (list): List of selected district names
-        
+        base_map (folium.Map): Optional prebuilt tiles+legend shell; it is
+            deep-copied so the caller's (typically cached) object stays
+            pristine while the selection-dependent layers go on the copy
+
     Returns:
         folium.Map: Complete map
     """
-    # Create base map
-    m = create_base_map()
-    
+    if base_map is not None:
+        m = copy.deepcopy(base_map)
+    else:
+        # Create base map with legend
+        m = create_base_map()
+        m = add_legend(m)
+
     # Add district boundaries
     m = add_district_layers(m, geojson_data, districts_dict, selected_districts)
-    
+
+    # With a selection, the view is zoomed to its bounding box, so clip
+    # the markers to that box before serializing them into the page
+    if selected_districts and len(selected_districts) > 0:
+        fire_data = clip_to_districts(fire_data, districts_dict, selected_districts)
+
     # Add fire markers
     m = add_fire_markers(m, fire_data)
-    
+
     # Zoom to selected districts
     if selected_districts and len(selected_districts) > 0:
-        m = zoom_to_districts(m, geojson_data, selected_districts)
-    
-    # Add legend
-    m = add_legend(m)
-    
+        m = zoom_to_districts(m, districts_dict, selected_districts)
+
     # Add layer control
     folium.LayerControl().add_to(m)
-    
+
     return m
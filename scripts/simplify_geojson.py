@@ -0,0 +1,55 @@
+"""
+One-off preprocessing script that writes a simplified copy of the Punjab
+districts GeoJSON for the app to serve instead of the full-resolution file.
+
+Run from the repository root:
+
+    python scripts/simplify_geojson.py [tolerance]
+
+The app prefers attached_assets/punjab.min.geojson when it exists; delete
+the file to fall back to the full-resolution boundaries.
+"""
+import json
+import os
+import sys
+
+from shapely.geometry import shape, mapping
+
+SOURCE_PATH = "attached_assets/punjab.geojson"
+TARGET_PATH = "attached_assets/punjab.min.geojson"
+DEFAULT_TOLERANCE = 0.005
+
+
+def simplify_geojson(source_path=SOURCE_PATH, target_path=TARGET_PATH,
+                     tolerance=DEFAULT_TOLERANCE):
+    """
+    Simplify every feature geometry and write the reduced GeoJSON
+
+    Args:
+        source_path (str): Path to the full-resolution GeoJSON
+        target_path (str): Path to write the simplified GeoJSON
+        tolerance (float): Douglas-Peucker tolerance in degrees
+
+    Returns:
+        str: Path to the simplified file
+    """
+    with open(source_path, 'r') as f:
+        geojson_data = json.load(f)
+
+    for feature in geojson_data['features']:
+        geom = shape(feature['geometry']).simplify(tolerance, preserve_topology=True)
+        feature['geometry'] = mapping(geom)
+
+    with open(target_path, 'w') as f:
+        json.dump(geojson_data, f, separators=(',', ':'))
+
+    return target_path
+
+
+if __name__ == "__main__":
+    tol = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TOLERANCE
+    target = simplify_geojson(tolerance=tol)
+    before = os.path.getsize(SOURCE_PATH)
+    after = os.path.getsize(target)
+    print(f"Wrote {target}: {before / 1024:.0f} KB -> {after / 1024:.0f} KB "
+          f"(tolerance={tol})")